@@ -6,10 +6,10 @@ Author: Ye(Alexia) Quan
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import pyarrow as pa
+import pyarrow.dataset as ds
 import sys
+from functools import lru_cache
 sys.path.append('src')
 from optimization import optimize_budget_allocation, compare_allocation_strategies
 
@@ -24,28 +24,178 @@ st.markdown("""<style>
 .success-card {background-color: #f0fff0; padding: 20px; border-left: 4px solid #28a745; margin: 15px 0; border-radius: 5px;}
 </style>""", unsafe_allow_html=True)
 
-@st.cache_data
-def load_data():
+# Columns the dashboard reads from each file, with the narrowest dtype that holds them
+REQUESTS_DTYPES = {
+    'service_line': 'category', 'budget_requested': 'float32', 'min_viable_budget': 'float32',
+    'expected_roi': 'float32', 'strategic_priority': 'int8', 'success_probability': 'float32'
+}
+HISTORICAL_ROI_DTYPES = {
+    'year': 'int16', 'service_line': 'category', 'investment': 'float32', 'revenue_generated': 'float32',
+    'roi': 'float32', 'projects_delivered': 'int16', 'avg_project_value': 'float32', 'client_satisfaction': 'float32'
+}
+SERVICE_METRICS_DTYPES = {
+    'onboarding_time_days': 'float32', 'defect_rate': 'float32',
+    'client_satisfaction': 'float32', 'team_utilization_pct': 'float32'
+}
+PROCESS_QUALITY_DTYPES = {
+    'requirements_clarity': 'float32', 'resource_availability': 'float32', 'communication_score': 'float32',
+    'technical_quality': 'float32', 'process_compliance_pct': 'float32', 'total_defects': 'int16'
+}
+CONSTRAINTS_DTYPES = {'constraint_type': 'category', 'value': 'float64'}
+
+@st.cache_resource
+def _open_tables():
+    # All five tables live in one hive-partitioned dataset: data/tables/name=<table>/
+    return ds.dataset('data/tables', format='parquet', partitioning='hive')
+
+def _read_table(name, dtypes):
     try:
-        return (
-            pd.read_csv('data/resource_requests.csv'),
-            pd.read_csv('data/historical_roi.csv'),
-            pd.read_csv('data/service_metrics.csv'),
-            pd.read_csv('data/process_quality.csv'),
-            pd.read_csv('data/constraints.csv')
-        )
+        # Tables have different schemas, so read each fragment with its own rather than the dataset's
+        fragments = _open_tables().get_fragments(filter=ds.field('name') == name)
+        table = pa.concat_tables([f.to_table(columns=list(dtypes)) for f in fragments])
+        return table.to_pandas().astype(dtypes)
     except Exception as e:
         st.error(f"Error loading data: {e}")
-        return None, None, None, None, None
+        return None
+
+@st.cache_data(ttl=3600)
+def load_requests():
+    return _read_table('resource_requests', REQUESTS_DTYPES)
+
+@st.cache_data(ttl=3600)
+def load_historical_roi():
+    return _read_table('historical_roi', HISTORICAL_ROI_DTYPES)
+
+@st.cache_data(ttl=3600)
+def load_service_metrics():
+    return _read_table('service_metrics', SERVICE_METRICS_DTYPES)
+
+@st.cache_data(ttl=3600)
+def load_process_quality():
+    return _read_table('process_quality', PROCESS_QUALITY_DTYPES)
+
+@st.cache_data(ttl=3600)
+def load_constraints():
+    return _read_table('constraints', CONSTRAINTS_DTYPES)
+
+@st.cache_data
+def _cached_optimize(rr, budget):
+    return optimize_budget_allocation(rr, budget)
+
+@st.cache_data
+def _cached_compare(rr, budget):
+    return compare_allocation_strategies(rr, budget)
 
+@st.cache_data
+def score_projects(rr):
+    roi = rr['expected_roi'].to_numpy()
+    fin = roi * (rr['budget_requested'].to_numpy() / 1e6)
+    fin = (fin - fin.min()) / (fin.max() - fin.min()) * 100
+    strat = rr['strategic_priority'].to_numpy() / 5 * 100
+    risk = rr['success_probability'].to_numpy() * 100
+    composite = fin * 0.4 + strat * 0.35 + risk * 0.25
+    scored = rr.assign(fin_score=fin, strat_score=strat, risk_score=risk, composite=composite)
+    return scored.sort_values('composite', ascending=False)
+
+@st.cache_data
+def sixsigma_kpis(sm):
+    return {
+        'onboard': sm['onboarding_time_days'].mean(),
+        'defect': sm['defect_rate'].mean() * 100,
+        'satis': sm['client_satisfaction'].mean(),
+        'util': sm['team_utilization_pct'].mean()
+    }
+
+PARETO_MAX_BARS = 20
+
+@st.cache_data
+def pareto_causes(max_bars=PARETO_MAX_BARS):
+    causes = pd.DataFrame({'Cause': ['Unclear requirements', 'Resource unavailable', 'Scope creep', 'Technical', 'Communication'], 'Freq': [35, 28, 18, 12, 8]})
+    causes = causes.sort_values('Freq', ascending=False, ignore_index=True)
+    # Fold the long tail into one bar so the chart payload stays bounded as the catalog grows
+    if len(causes) > max_bars:
+        tail = causes['Freq'].iloc[max_bars - 1:].sum()
+        causes = pd.concat([causes.iloc[:max_bars - 1], pd.DataFrame({'Cause': ['Other'], 'Freq': [tail]})], ignore_index=True)
+    causes['Cum%'] = causes['Freq'].cumsum() / causes['Freq'].sum() * 100
+    return causes
+
+@lru_cache(maxsize=512)
 def fmt_curr(val):
     return f"${val/1e6:.1f}M" if val >= 1e6 else f"${val/1e3:.0f}K"
 
+@st.fragment
+def _render_optimization(result, strategies, rr):
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
+    col1, col2, col3 = st.columns(3)
+    
+    col1.markdown(f"""<div class='success-card'>
+        <strong>✅ Status: {result['status']}</strong><br>
+        Allocated: {fmt_curr(result['total_allocated'])}<br>
+        Utilization: {result['budget_utilization']:.1f}%<br>
+        Funded: {len(result['funded_projects'])} of {len(rr)}
+    </div>""", unsafe_allow_html=True)
+    
+    col2.markdown(f"""<div class='success-card'>
+        <strong>📈 Performance</strong><br>
+        Blended ROI: {result['blended_roi']:.2f}x<br>
+        Expected Return: {fmt_curr(result['total_expected_return'])}<br>
+        Net Value: {fmt_curr(result['total_expected_return']-result['total_allocated'])}
+    </div>""", unsafe_allow_html=True)
+    
+    improvement = ((result['blended_roi']-strategies['Equal']['blended_roi'])/strategies['Equal']['blended_roi'])*100
+    
+    col3.markdown(f"""<div class='success-card'>
+        <strong>💡 vs Equal Allocation</strong><br>
+        Equal ROI: {strategies['Equal']['blended_roi']:.2f}x<br>
+        Optimized: {result['blended_roi']:.2f}x<br>
+        Improvement: +{improvement:.1f}%
+    </div>""", unsafe_allow_html=True)
+    
+    # One pass over the allocations into a record array, one field per column
+    allocations = result['allocations']
+    rows = np.fromiter(
+        ((sl, i['requested'], i['allocated'], i['funded'], i['expected_roi']) for sl, i in allocations.items()),
+        dtype=[('service', object), ('requested', 'f4'), ('allocated', 'f4'), ('funded', '?'), ('roi', 'f4')],
+        count=len(allocations)
+    )
+    services, requested, allocated, funded, roi = (rows[f] for f in rows.dtype.names)
+    
+    # Table
+    alloc_df = pd.DataFrame({
+        'Service Line': services,
+        'Requested': requested / 1e6,
+        'Allocated': allocated / 1e6,
+        'Funded': np.where(funded, '✅', '❌'),
+        'ROI': roi
+    })
+    st.dataframe(alloc_df, use_container_width=True, hide_index=True, column_config={
+        'Requested': st.column_config.NumberColumn(format="$%.1fM"),
+        'Allocated': st.column_config.NumberColumn(format="$%.1fM"),
+        'ROI': st.column_config.NumberColumn(format="%.2fx")
+    })
+    
+    # Charts
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig = go.Figure()
+        fig.add_trace(go.Bar(name='Requested', x=services, y=requested, marker_color='lightblue'))
+        fig.add_trace(go.Bar(name='Allocated', x=services, y=allocated, marker_color='darkblue'))
+        fig.update_layout(title='Requested vs Allocated', barmode='group', height=400, xaxis_tickangle=-45)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        fig = px.pie(values=allocated[funded], names=services[funded], title='Budget Distribution', hole=0.4)
+        fig.update_layout(height=400)
+        st.plotly_chart(fig, use_container_width=True)
+
 def page_optimization():
     st.title("📊 Strategic Resource Allocation (PuLP Optimization)")
     
-    rr, _, _, _, cons = load_data()
-    if rr is None: 
+    rr, cons = load_requests(), load_constraints()
+    if rr is None or cons is None:
         st.error("Run: python src/generate_sample_data.py")
         return
     
@@ -61,68 +211,11 @@ def page_optimization():
     st.markdown("### 🎯 PuLP Optimization Results")
     
     try:
-        result = optimize_budget_allocation(rr, budget)
+        result = _cached_optimize(rr, budget)
         
         if result['status'] == 'Optimal':
-            col1, col2, col3 = st.columns(3)
-            
-            col1.markdown(f"""<div class='success-card'>
-                <strong>✅ Status: {result['status']}</strong><br>
-                Allocated: {fmt_curr(result['total_allocated'])}<br>
-                Utilization: {result['budget_utilization']:.1f}%<br>
-                Funded: {len(result['funded_projects'])} of {len(rr)}
-            </div>""", unsafe_allow_html=True)
-            
-            col2.markdown(f"""<div class='success-card'>
-                <strong>📈 Performance</strong><br>
-                Blended ROI: {result['blended_roi']:.2f}x<br>
-                Expected Return: {fmt_curr(result['total_expected_return'])}<br>
-                Net Value: {fmt_curr(result['total_expected_return']-result['total_allocated'])}
-            </div>""", unsafe_allow_html=True)
-            
-            strategies = compare_allocation_strategies(rr, budget)
-            improvement = ((result['blended_roi']-strategies['Equal']['blended_roi'])/strategies['Equal']['blended_roi'])*100
-            
-            col3.markdown(f"""<div class='success-card'>
-                <strong>💡 vs Equal Allocation</strong><br>
-                Equal ROI: {strategies['Equal']['blended_roi']:.2f}x<br>
-                Optimized: {result['blended_roi']:.2f}x<br>
-                Improvement: +{improvement:.1f}%
-            </div>""", unsafe_allow_html=True)
-            
-            # Table
-            alloc_data = []
-            for sl, info in result['allocations'].items():
-                alloc_data.append({
-                    'Service Line': sl,
-                    'Requested': fmt_curr(info['requested']),
-                    'Allocated': fmt_curr(info['allocated']),
-                    'Funded': '✅' if info['funded'] else '❌',
-                    'ROI': f"{info['expected_roi']:.2f}x"
-                })
-            st.dataframe(pd.DataFrame(alloc_data), use_container_width=True, hide_index=True)
-            
-            # Charts
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                comp_df = pd.DataFrame({
-                    'Service': list(result['allocations'].keys()),
-                    'Requested': [result['allocations'][s]['requested'] for s in result['allocations'].keys()],
-                    'Allocated': [result['allocations'][s]['allocated'] for s in result['allocations'].keys()]
-                })
-                fig = go.Figure()
-                fig.add_trace(go.Bar(name='Requested', x=comp_df['Service'], y=comp_df['Requested'], marker_color='lightblue'))
-                fig.add_trace(go.Bar(name='Allocated', x=comp_df['Service'], y=comp_df['Allocated'], marker_color='darkblue'))
-                fig.update_layout(title='Requested vs Allocated', barmode='group', height=400, xaxis_tickangle=-45)
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                funded = [s for s, i in result['allocations'].items() if i['funded']]
-                amounts = [result['allocations'][s]['allocated'] for s in funded]
-                fig = px.pie(values=amounts, names=funded, title='Budget Distribution', hole=0.4)
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
+            strategies = _cached_compare(rr, budget)
+            _render_optimization(result, strategies, rr)
         else:
             st.error(f"Optimization failed: {result['status']}")
     except Exception as e:
@@ -160,6 +253,8 @@ def page_drivers():
         </div>""", unsafe_allow_html=True)
 
 def page_scenarios():
+    import plotly.graph_objects as go
+    
     st.title("🔮 Scenario Modeling")
     
     col1, col2, col3 = st.columns(3)
@@ -176,9 +271,13 @@ def page_scenarios():
     
     data = []
     for name, s in scenarios.items():
-        data.append({'Scenario': name, 'Revenue': fmt_curr(s['revenue']), 'Growth': f"{s['growth']:.0f}%", 'Income': fmt_curr(s['income'])})
+        data.append({'Scenario': name, 'Revenue': s['revenue'] / 1e6, 'Growth': s['growth'], 'Income': s['income'] / 1e6})
     
-    st.dataframe(pd.DataFrame(data), use_container_width=True, hide_index=True)
+    st.dataframe(pd.DataFrame(data), use_container_width=True, hide_index=True, column_config={
+        'Revenue': st.column_config.NumberColumn(format="$%.1fM"),
+        'Growth': st.column_config.NumberColumn(format="%.0f%%"),
+        'Income': st.column_config.NumberColumn(format="$%.1fM")
+    })
     
     fig = go.Figure()
     for name in scenarios.keys():
@@ -187,9 +286,12 @@ def page_scenarios():
     st.plotly_chart(fig, use_container_width=True)
 
 def page_sixsigma():
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
     st.title("⭐ Six Sigma Dashboard")
     
-    _, _, sm, _, _ = load_data()
+    sm = load_service_metrics()
     if sm is None: return
     
     dmaic = {'Define': '✅ Complete', 'Measure': '✅ Complete', 'Analyze': '🔄 In Progress', 'Improve': '📋 Planned', 'Control': '📋 Planned'}
@@ -200,10 +302,8 @@ def page_sixsigma():
     st.markdown("### 📊 Key Metrics")
     col1, col2, col3, col4 = st.columns(4)
     
-    onboard = sm['onboarding_time_days'].mean()
-    defect = sm['defect_rate'].mean() * 100
-    satis = sm['client_satisfaction'].mean()
-    util = sm['team_utilization_pct'].mean()
+    kpis = sixsigma_kpis(sm)
+    onboard, defect, satis, util = kpis['onboard'], kpis['defect'], kpis['satis'], kpis['util']
     
     col1.metric("Onboarding", f"{onboard:.1f} days", f"{onboard-14:.1f} vs target")
     col2.metric("Defect Rate", f"{defect:.1f}%", f"{defect-3:.1f}pts vs target")
@@ -212,16 +312,16 @@ def page_sixsigma():
     
     st.markdown("### 🔍 Root Cause Analysis (Pareto)")
     
-    causes = pd.DataFrame({'Cause': ['Unclear requirements', 'Resource unavailable', 'Scope creep', 'Technical', 'Communication'], 'Freq': [35, 28, 18, 12, 8]})
-    causes['Cum%'] = causes['Freq'].cumsum() / causes['Freq'].sum() * 100
+    causes = pareto_causes()
     
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig.add_trace(go.Bar(x=causes['Cause'], y=causes['Freq'], marker_color='steelblue'), secondary_y=False)
-    fig.add_trace(go.Scatter(x=causes['Cause'], y=causes['Cum%'], mode='lines+markers', line=dict(color='red', width=2)), secondary_y=True)
-    fig.update_layout(title='Defect Causes', height=400)
-    fig.update_yaxes(title_text="Frequency", secondary_y=False)
-    fig.update_yaxes(title_text="Cumulative %", range=[0, 100], secondary_y=True)
-    st.plotly_chart(fig, use_container_width=True)
+    with st.spinner("Building Pareto chart..."):
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        fig.add_trace(go.Bar(x=causes['Cause'], y=causes['Freq'], marker_color='steelblue'), secondary_y=False)
+        fig.add_trace(go.Scattergl(x=causes['Cause'], y=causes['Cum%'], mode='lines+markers', line=dict(color='red', width=2)), secondary_y=True)
+        fig.update_layout(title='Defect Causes', height=400)
+        fig.update_yaxes(title_text="Frequency", secondary_y=False)
+        fig.update_yaxes(title_text="Cumulative %", range=[0, 100], secondary_y=True)
+        st.plotly_chart(fig, use_container_width=True)
     
     st.markdown("""<div class='six-sigma-card'>
         📊 Top 3 causes = 76% of defects<br>
@@ -230,26 +330,24 @@ def page_sixsigma():
     </div>""", unsafe_allow_html=True)
 
 def page_roi():
+    import plotly.express as px
+    
     st.title("🎯 ROI Prioritization")
     
-    rr, _, _, _, _ = load_data()
+    rr = load_requests()
     if rr is None: return
     
-    rr['fin_score'] = rr['expected_roi'] * (rr['budget_requested'] / 1e6)
-    rr['fin_score'] = (rr['fin_score'] - rr['fin_score'].min()) / (rr['fin_score'].max() - rr['fin_score'].min()) * 100
-    rr['strat_score'] = (rr['strategic_priority'] / 5) * 100
-    rr['risk_score'] = rr['success_probability'] * 100
-    rr['composite'] = rr['fin_score'] * 0.4 + rr['strat_score'] * 0.35 + rr['risk_score'] * 0.25
-    
-    sorted_rr = rr.sort_values('composite', ascending=False)
+    sorted_rr = score_projects(rr)
     
     df = sorted_rr[['service_line', 'budget_requested', 'expected_roi', 'strategic_priority', 'composite']].copy()
-    df['budget_requested'] = df['budget_requested'].apply(fmt_curr)
-    df['expected_roi'] = df['expected_roi'].apply(lambda x: f"{x:.2f}x")
-    df['composite'] = df['composite'].apply(lambda x: f"{x:.1f}")
+    df['budget_requested'] = df['budget_requested'] / 1e6
     df.columns = ['Service Line', 'Budget', 'ROI', 'Priority', 'Score']
     
-    st.dataframe(df, use_container_width=True, hide_index=True)
+    st.dataframe(df, use_container_width=True, hide_index=True, column_config={
+        'Budget': st.column_config.NumberColumn(format="$%.1fM"),
+        'ROI': st.column_config.NumberColumn(format="%.2fx"),
+        'Score': st.column_config.NumberColumn(format="%.1f")
+    })
     
     fig = px.bar(sorted_rr, y='service_line', x='composite', title='Composite Scores', orientation='h', color='composite', color_continuous_scale='Viridis')
     fig.update_layout(height=500, showlegend=False)
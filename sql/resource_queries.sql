@@ -6,7 +6,7 @@
 -- 1. RESOURCE REQUEST SUMMARY
 -- ================================================
 -- Pull current budget requests from department heads
--- Maps to: resource_requests.csv
+-- Maps to: data/tables/name=resource_requests
 
 SELECT 
     d.department_name as service_line,
@@ -26,7 +26,7 @@ ORDER BY br.strategic_priority_score DESC, br.expected_roi DESC;
 -- 2. HISTORICAL ROI PERFORMANCE
 -- ================================================
 -- Calculate actual ROI by service line over past 3 years
--- Maps to: historical_roi.csv
+-- Maps to: data/tables/name=historical_roi
 
 SELECT 
     YEAR(t.transaction_date) as year,
@@ -49,7 +49,7 @@ ORDER BY year DESC, roi DESC;
 -- 3. SERVICE DELIVERY METRICS (Six Sigma)
 -- ================================================
 -- Daily operational metrics for process improvement
--- Maps to: service_metrics.csv
+-- Maps to: data/tables/name=service_metrics
 
 SELECT 
     DATE(pd.completed_date) as date,
@@ -75,7 +75,7 @@ ORDER BY date DESC;
 -- 4. PROCESS QUALITY METRICS (Six Sigma Control Charts)
 -- ================================================
 -- Daily process quality indicators
--- Maps to: process_quality.csv
+-- Maps to: data/tables/name=process_quality
 
 SELECT 
     DATE(pq.measurement_date) as date,
@@ -100,7 +100,7 @@ ORDER BY date DESC;
 -- 5. BUDGET CONSTRAINTS
 -- ================================================
 -- Current fiscal constraints and policies
--- Maps to: constraints.csv
+-- Maps to: data/tables/name=constraints
 
 SELECT 
     'total_budget' as constraint_type,
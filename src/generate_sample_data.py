@@ -12,11 +12,26 @@ Generates:
 Author: Ye(Alexia) Quan
 """
 
+import os
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
-np.random.seed(42)
+RNG = np.random.default_rng(42)
+
+def _narrow(col):
+    """Narrow floats to float32 and integers to int16 when every value fits"""
+    if col.dtype.kind == 'f':
+        return col.astype(np.float32)
+    if col.dtype.kind == 'i':
+        bounds = np.iinfo(np.int16)
+        if col.size == 0 or (col.min() >= bounds.min and col.max() <= bounds.max):
+            return col.astype(np.int16)
+    return col
+
+def _compact_frame(cols):
+    """Wrap generated column arrays in a DataFrame, narrowed to float32/int16 storage"""
+    return pd.DataFrame({name: _narrow(col) for name, col in cols.items()})
 
 def generate_resource_requests():
     """
@@ -134,7 +149,7 @@ def generate_resource_requests():
     
     return df
 
-def generate_historical_roi():
+def generate_historical_roi(rng=RNG):
     """Generate historical ROI data for service lines over past 3 years"""
     
     service_lines = [
@@ -150,160 +165,133 @@ def generate_historical_roi():
         'Client Success'
     ]
     
-    years = [2022, 2023, 2024]
-    
-    data = []
-    for year in years:
-        for service in service_lines:
-            # Base ROI with variation by service and year
-            if service == 'Email Marketing':
-                base_roi = 3.5
-            elif service == 'Marketing Automation':
-                base_roi = 3.2
-            elif service == 'E-Commerce Optimization':
-                base_roi = 2.9
-            elif service == 'Digital Marketing Campaigns':
-                base_roi = 2.8
-            elif service == 'SEO/SEM Services':
-                base_roi = 2.6
-            elif service == 'Brand Strategy':
-                base_roi = 2.4
-            elif service == 'Content Marketing':
-                base_roi = 2.2
-            elif service == 'Analytics & Reporting':
-                base_roi = 2.0
-            elif service == 'Social Media Management':
-                base_roi = 1.9
-            else:
-                base_roi = 1.8
-            
-            # ROI improves over years (learning curve)
-            year_factor = 1 + (year - 2022) * 0.05
-            roi = base_roi * year_factor * np.random.uniform(0.95, 1.05)
-            
-            investment = np.random.uniform(800_000, 3_000_000)
-            revenue_generated = investment * roi
-            
-            # Project metrics
-            projects_delivered = int(np.random.uniform(15, 60))
-            avg_project_value = revenue_generated / projects_delivered
-            
-            data.append({
-                'year': year,
-                'service_line': service,
-                'investment': investment,
-                'revenue_generated': revenue_generated,
-                'roi': roi,
-                'projects_delivered': projects_delivered,
-                'avg_project_value': avg_project_value,
-                'client_satisfaction': np.random.uniform(4.0, 4.8)
-            })
-    
-    return pd.DataFrame(data)
+    # Base ROI by service line, aligned with service_lines
+    base_roi = np.array([2.8, 3.2, 2.4, 2.9, 2.2, 1.9, 3.5, 2.6, 2.0, 1.8])
+    
+    years = np.array([2022, 2023, 2024])
+    
+    # One row per (year, service line): years down the rows, services across
+    shape = (len(years), len(service_lines))
+    
+    # ROI improves over years (learning curve)
+    year_factor = 1 + (years[:, None] - 2022) * 0.05
+    roi = base_roi * year_factor * rng.uniform(0.95, 1.05, shape)
+    
+    investment = rng.uniform(800_000, 3_000_000, shape)
+    revenue_generated = investment * roi
+    
+    # Project metrics
+    projects_delivered = rng.uniform(15, 60, shape).astype(int)
+    avg_project_value = revenue_generated / projects_delivered
+    
+    return _compact_frame({
+        'year': np.repeat(years, len(service_lines)),
+        'service_line': np.tile(service_lines, len(years)),
+        'investment': investment.ravel(),
+        'revenue_generated': revenue_generated.ravel(),
+        'roi': roi.ravel(),
+        'projects_delivered': projects_delivered.ravel(),
+        'avg_project_value': avg_project_value.ravel(),
+        'client_satisfaction': rng.uniform(4.0, 4.8, shape).ravel()
+    })
 
-def generate_service_metrics():
+def generate_service_metrics(rng=RNG):
     """Generate service delivery metrics for Six Sigma analysis"""
     
     # Generate 90 days of data
     dates = pd.date_range(start='2024-01-01', periods=90, freq='D')
+    n_days = len(dates)
+    
+    # Onboarding metrics
+    onboarding_time = rng.normal(21, 3, n_days)  # Mean 21 days, currently above 14-day target
+    onboarding_time = np.clip(onboarding_time, 12, 35)
+    
+    # Project delivery metrics
+    projects_completed = rng.poisson(3, n_days)  # Average 3 projects per day
+    on_time_delivery = rng.binomial(projects_completed, 0.88)  # 88% on-time rate
+    
+    # Quality metrics
+    defects = rng.binomial(projects_completed, 0.08)  # 8% defect rate (target: 3%)
+    rework_hours = defects * rng.uniform(8, 24, n_days)
+    
+    # Client satisfaction (daily average)
+    satisfaction_score = rng.normal(4.2, 0.3, n_days)  # Mean 4.2, target 4.5
+    satisfaction_score = np.clip(satisfaction_score, 3.0, 5.0)
+    
+    # Resource utilization
+    team_utilization = rng.normal(65, 8, n_days)  # 65% utilization (room for improvement)
+    team_utilization = np.clip(team_utilization, 45, 85)
+    
+    # Cycle time metrics
+    lead_to_kickoff_days = rng.normal(14, 4, n_days)  # Time from lead to project start
+    kickoff_to_launch_days = rng.normal(30, 7, n_days)  # Project duration
     
-    data = []
-    for date in dates:
-        # Onboarding metrics
-        onboarding_time = np.random.normal(21, 3)  # Mean 21 days, currently above 14-day target
-        onboarding_time = np.clip(onboarding_time, 12, 35)
-        
-        # Project delivery metrics
-        projects_completed = np.random.poisson(3)  # Average 3 projects per day
-        on_time_delivery = np.random.binomial(projects_completed, 0.88)  # 88% on-time rate
-        
-        # Quality metrics
-        defects = np.random.binomial(projects_completed, 0.08)  # 8% defect rate (target: 3%)
-        rework_hours = defects * np.random.uniform(8, 24)
-        
-        # Client satisfaction (daily average)
-        satisfaction_score = np.random.normal(4.2, 0.3)  # Mean 4.2, target 4.5
-        satisfaction_score = np.clip(satisfaction_score, 3.0, 5.0)
-        
-        # Resource utilization
-        team_utilization = np.random.normal(65, 8)  # 65% utilization (room for improvement)
-        team_utilization = np.clip(team_utilization, 45, 85)
-        
-        # Cycle time metrics
-        lead_to_kickoff_days = np.random.normal(14, 4)  # Time from lead to project start
-        kickoff_to_launch_days = np.random.normal(30, 7)  # Project duration
-        
-        data.append({
-            'date': date,
-            'onboarding_time_days': onboarding_time,
-            'projects_completed': projects_completed,
-            'on_time_deliveries': on_time_delivery,
-            'on_time_rate': on_time_delivery / projects_completed if projects_completed > 0 else 0,
-            'defects': defects,
-            'defect_rate': defects / projects_completed if projects_completed > 0 else 0,
-            'rework_hours': rework_hours,
-            'client_satisfaction': satisfaction_score,
-            'team_utilization_pct': team_utilization,
-            'lead_to_kickoff_days': lead_to_kickoff_days,
-            'kickoff_to_launch_days': kickoff_to_launch_days,
-            'total_cycle_time': lead_to_kickoff_days + kickoff_to_launch_days
-        })
-    
-    return pd.DataFrame(data)
+    # Rates are 0 on days with no completed projects
+    has_projects = projects_completed > 0
+    on_time_rate = np.divide(on_time_delivery, projects_completed, out=np.zeros(n_days), where=has_projects)
+    defect_rate = np.divide(defects, projects_completed, out=np.zeros(n_days), where=has_projects)
+    
+    return _compact_frame({
+        'date': dates,
+        'onboarding_time_days': onboarding_time,
+        'projects_completed': projects_completed,
+        'on_time_deliveries': on_time_delivery,
+        'on_time_rate': on_time_rate,
+        'defects': defects,
+        'defect_rate': defect_rate,
+        'rework_hours': rework_hours,
+        'client_satisfaction': satisfaction_score,
+        'team_utilization_pct': team_utilization,
+        'lead_to_kickoff_days': lead_to_kickoff_days,
+        'kickoff_to_launch_days': kickoff_to_launch_days,
+        'total_cycle_time': lead_to_kickoff_days + kickoff_to_launch_days
+    })
 
-def generate_process_quality():
+def generate_process_quality(rng=RNG):
     """Generate process quality data for Six Sigma control charts"""
     
     # Generate 90 days of process metrics
     dates = pd.date_range(start='2024-01-01', periods=90, freq='D')
+    n_days = len(dates)
+    
+    # Process metrics with variation
+    
+    # Requirements clarity score (1-10)
+    requirements_clarity = np.clip(rng.normal(6.5, 1.5, n_days), 1, 10)
+    
+    # Resource availability score (1-10)
+    resource_availability = np.clip(rng.normal(7.0, 1.2, n_days), 1, 10)
+    
+    # Communication effectiveness (1-10)
+    communication_score = np.clip(rng.normal(7.5, 1.0, n_days), 1, 10)
+    
+    # Technical execution quality (1-10)
+    technical_quality = np.clip(rng.normal(8.0, 1.0, n_days), 1, 10)
+    
+    # Process compliance (% adherence to standards)
+    process_compliance = np.clip(rng.normal(75, 10, n_days), 50, 100)
     
-    data = []
-    for date in dates:
-        # Process metrics with variation
-        
-        # Requirements clarity score (1-10)
-        requirements_clarity = np.random.normal(6.5, 1.5)
-        requirements_clarity = np.clip(requirements_clarity, 1, 10)
-        
-        # Resource availability score (1-10)
-        resource_availability = np.random.normal(7.0, 1.2)
-        resource_availability = np.clip(resource_availability, 1, 10)
-        
-        # Communication effectiveness (1-10)
-        communication_score = np.random.normal(7.5, 1.0)
-        communication_score = np.clip(communication_score, 1, 10)
-        
-        # Technical execution quality (1-10)
-        technical_quality = np.random.normal(8.0, 1.0)
-        technical_quality = np.clip(technical_quality, 1, 10)
-        
-        # Process compliance (% adherence to standards)
-        process_compliance = np.random.normal(75, 10)
-        process_compliance = np.clip(process_compliance, 50, 100)
-        
-        # Defect categories
-        unclear_requirements = np.random.poisson(0.35)
-        resource_unavailable = np.random.poisson(0.28)
-        scope_creep = np.random.poisson(0.18)
-        technical_issues = np.random.poisson(0.12)
-        communication_gaps = np.random.poisson(0.08)
-        
-        data.append({
-            'date': date,
-            'requirements_clarity': requirements_clarity,
-            'resource_availability': resource_availability,
-            'communication_score': communication_score,
-            'technical_quality': technical_quality,
-            'process_compliance_pct': process_compliance,
-            'defect_unclear_requirements': unclear_requirements,
-            'defect_resource_unavailable': resource_unavailable,
-            'defect_scope_creep': scope_creep,
-            'defect_technical': technical_issues,
-            'defect_communication': communication_gaps,
-            'total_defects': unclear_requirements + resource_unavailable + scope_creep + technical_issues + communication_gaps
-        })
-    
-    return pd.DataFrame(data)
+    # Defect categories
+    unclear_requirements = rng.poisson(0.35, n_days)
+    resource_unavailable = rng.poisson(0.28, n_days)
+    scope_creep = rng.poisson(0.18, n_days)
+    technical_issues = rng.poisson(0.12, n_days)
+    communication_gaps = rng.poisson(0.08, n_days)
+    
+    return _compact_frame({
+        'date': dates,
+        'requirements_clarity': requirements_clarity,
+        'resource_availability': resource_availability,
+        'communication_score': communication_score,
+        'technical_quality': technical_quality,
+        'process_compliance_pct': process_compliance,
+        'defect_unclear_requirements': unclear_requirements,
+        'defect_resource_unavailable': resource_unavailable,
+        'defect_scope_creep': scope_creep,
+        'defect_technical': technical_issues,
+        'defect_communication': communication_gaps,
+        'total_defects': unclear_requirements + resource_unavailable + scope_creep + technical_issues + communication_gaps
+    })
 
 def generate_constraints():
     """Generate budget and operational constraints"""
@@ -361,41 +349,47 @@ def generate_constraints():
     
     return pd.DataFrame(constraints)
 
+def _generate_and_save(name, generate):
+    """Build one dataset and write it as the name=<name> partition of data/tables"""
+    df = generate()
+    os.makedirs(f'data/tables/name={name}', exist_ok=True)
+    df.to_parquet(f'data/tables/name={name}/part.parquet', engine='pyarrow', compression='zstd', index=False)
+    return df
+
 def main():
     """Generate all sample data files"""
     
-    import os
+    from concurrent.futures import ThreadPoolExecutor
     
     # Create data directory if it doesn't exist
-    os.makedirs('data', exist_ok=True)
+    os.makedirs('data/tables', exist_ok=True)
     
     print("Generating Resource Planning Engine sample data...")
     
-    # Generate datasets
-    print("  1/5 Generating resource requests...")
-    resource_requests = generate_resource_requests()
-    resource_requests.to_csv('data/resource_requests.csv', index=False)
-    print(f"      Created: data/resource_requests.csv ({len(resource_requests)} records)")
-    
-    print("  2/5 Generating historical ROI data...")
-    historical_roi = generate_historical_roi()
-    historical_roi.to_csv('data/historical_roi.csv', index=False)
-    print(f"      Created: data/historical_roi.csv ({len(historical_roi)} records)")
-    
-    print("  3/5 Generating service metrics...")
-    service_metrics = generate_service_metrics()
-    service_metrics.to_csv('data/service_metrics.csv', index=False)
-    print(f"      Created: data/service_metrics.csv ({len(service_metrics)} records)")
-    
-    print("  4/5 Generating process quality data...")
-    process_quality = generate_process_quality()
-    process_quality.to_csv('data/process_quality.csv', index=False)
-    print(f"      Created: data/process_quality.csv ({len(process_quality)} records)")
-    
-    print("  5/5 Generating constraints...")
-    constraints = generate_constraints()
-    constraints.to_csv('data/constraints.csv', index=False)
-    print(f"      Created: data/constraints.csv ({len(constraints)} records)")
+    # Each random dataset gets its own child seed so the tables can be
+    # generated concurrently and still come out the same on every run
+    metrics_seed, roi_seed, quality_seed = np.random.SeedSequence(42).spawn(3)
+    
+    datasets = {
+        'resource_requests': generate_resource_requests,
+        'historical_roi': lambda: generate_historical_roi(np.random.default_rng(roi_seed)),
+        'service_metrics': lambda: generate_service_metrics(np.random.default_rng(metrics_seed)),
+        'process_quality': lambda: generate_process_quality(np.random.default_rng(quality_seed)),
+        'constraints': generate_constraints
+    }
+    
+    # Generate datasets (NumPy and the Parquet writer release the GIL)
+    with ThreadPoolExecutor(max_workers=len(datasets)) as executor:
+        futures = {name: executor.submit(_generate_and_save, name, generate) for name, generate in datasets.items()}
+        frames = {name: future.result() for name, future in futures.items()}
+    
+    for i, (name, df) in enumerate(frames.items(), 1):
+        print(f"  {i}/{len(frames)} Created: data/tables/name={name}/part.parquet ({len(df)} records)")
+    
+    resource_requests = frames['resource_requests']
+    historical_roi = frames['historical_roi']
+    service_metrics = frames['service_metrics']
+    constraints = frames['constraints']
     
     print("\n✅ All sample data generated successfully!")
     print("\nData Summary:")
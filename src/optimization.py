@@ -11,6 +11,92 @@ Author: Ye(Alexia) Quan
 from pulp import *
 import pandas as pd
 import numpy as np
+import copy
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional; the kernels below run as plain Python without it
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# HiGHS releases the GIL and CBC runs as a subprocess, so threads are enough
+# to overlap independent solves
+MAX_SOLVER_WORKERS = min(8, os.cpu_count() or 1)
+
+def _make_solver(mip, warm_start=False):
+    """
+    Pick the solver for a model.
+    
+    Pure LPs go to in-process HiGHS when highspy is installed, which avoids
+    CBC's subprocess and LP-file round trip. MILPs stay on the bundled CBC
+    binary, whose branch-and-bound is quicker than HiGHS's MIP setup at
+    this problem size.
+    """
+    if not mip:
+        highs = HiGHS(msg=False, threads=1)
+        if highs.available():
+            return highs
+    return PULP_CBC_CMD(msg=0, threads=1, warmStart=warm_start)
+
+# Request columns used as solver inputs, cast to float64 once per call
+NUMERIC_COLUMNS = ['budget_requested', 'min_viable_budget', 'expected_roi', 'strategic_priority']
+
+class _RequestsKey:
+    """Hashable wrapper keying a resource_requests frame by its contents."""
+    
+    __slots__ = ('frame', 'digest', '_inputs')
+    
+    def __init__(self, frame):
+        self.frame = frame
+        digest = hashlib.blake2b('|'.join(map(str, frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+        self.digest = digest.digest()
+        self._inputs = None
+    
+    @property
+    def inputs(self):
+        # Solver arrays, extracted on the first cache miss and shared by later
+        # ones; the frame is released so cached keys do not keep it alive
+        if self._inputs is None:
+            self._inputs = _request_arrays(self.frame)
+            self.frame = None
+        return self._inputs
+    
+    def __hash__(self):
+        return hash(self.digest)
+    
+    def __eq__(self, other):
+        return isinstance(other, _RequestsKey) and self.digest == other.digest
+
+@lru_cache(maxsize=128)
+def _solve_cached(requests_key, total_budget, constraint_items):
+    return _optimize_core(*requests_key.inputs, total_budget, dict(constraint_items) or None)
+
+def _cached_result(requests_key, total_budget, constraints=None):
+    # Identical (requests, budget, constraints) inputs reuse the earlier solve;
+    # callers get a copy so the cached result cannot be mutated
+    result = _solve_cached(
+        requests_key,
+        float(total_budget),
+        tuple(sorted((constraints or {}).items()))
+    )
+    return copy.deepcopy(result)
+
+def _request_arrays(resource_requests):
+    """Extract the solver inputs from the frame once, as float64 arrays aligned with service_lines."""
+    values = resource_requests[NUMERIC_COLUMNS].astype(np.float64)
+    return (
+        resource_requests['service_line'].tolist(),
+        values['expected_roi'].to_numpy(),
+        values['strategic_priority'].to_numpy(),
+        values['min_viable_budget'].to_numpy(),
+        values['budget_requested'].to_numpy()
+    )
 
 def optimize_budget_allocation(
     resource_requests,
@@ -40,11 +126,79 @@ def optimize_budget_allocation(
         dict: Optimization results including allocations and metrics
     """
     
+    return _cached_result(_RequestsKey(resource_requests), total_budget, constraints)
+
+def _optimize_core(service_lines, roi, prio, min_arr, max_arr, total_budget, constraints):
+    # Budgets that cover every profitable, fundable line, fall below every
+    # minimum, or whose greedy fill is already viable have a known optimum
+    # and need no solve
+    coef = _objective_coef(roi, prio, constraints)
+    trivial = _trivial_allocation(coef, roi, min_arr, max_arr, total_budget, constraints)
+    if trivial is not None:
+        lookups = {
+            'service_lines': service_lines,
+            'roi': dict(zip(service_lines, roi.tolist())),
+            'prio': dict(zip(service_lines, prio.tolist())),
+            'maxb': dict(zip(service_lines, max_arr.tolist()))
+        }
+        alloc_vals = dict(zip(service_lines, trivial.tolist()))
+        funded_vals = {sl: alloc > 0 for sl, alloc in alloc_vals.items()}
+        objective = float(coef @ trivial)
+        return _assemble_results('Optimal', objective, lookups, alloc_vals, funded_vals, total_budget)
+    
+    model = _build_problem(service_lines, roi, prio, min_arr, max_arr, total_budget, constraints, coef)
+    
+    # Solve the optimization problem
+    model['prob'].solve(_make_solver(model['funded'] is not None))
+    
+    return _extract_results(model, total_budget)
+
+def _trivial_allocation(coef, roi, min_arr, max_arr, total_budget, constraints):
+    """
+    Return the allocation for budgets whose optimum is known without solving.
+    
+    A budget covering every fundable line with a positive weighted ROI funds
+    each of those in full and leaves the rest at zero (a line whose minimum
+    viable budget exceeds its request can never be funded); one below the
+    smallest minimum viable budget funds nothing. Without constraints, any
+    other budget takes the greedy fill when it is viable, so the optimizer
+    and the sensitivity table break ties the same way. Negative budgets,
+    per-service caps and a funded-project count always solve.
+    """
+    if total_budget < 0:
+        return None
+    if constraints and ('max_per_service' in constraints or 'min_funded_projects' in constraints):
+        return None
+    profitable = (coef > 0) & (max_arr >= min_arr)
+    if total_budget >= max_arr[profitable].sum():
+        return np.where(profitable, max_arr, 0)
+    if len(min_arr) and total_budget < min_arr.min():
+        return np.zeros_like(max_arr)
+    if not constraints:
+        return _relaxed_allocation(coef, roi, min_arr, max_arr, total_budget)
+    return None
+
+def _objective_coef(roi, prio, constraints):
+    coef = roi * prio
+    
+    # Optional Constraint 5: Strategic priority threshold
+    # High priority projects (priority >= 4) get a 10% objective bonus so
+    # they are preferred when ROI is otherwise close
+    if constraints and constraints.get('prioritize_high_priority'):
+        coef[prio >= 4] *= 1.1
+    
+    return coef
+
+def _build_problem(service_lines, roi, prio, min_arr, max_arr, total_budget, constraints, coef=None):
     # Initialize the optimization problem
     prob = LpProblem("Budget_Allocation_Optimization", LpMaximize)
     
-    # Decision variables: allocation amount for each service line
-    service_lines = resource_requests['service_line'].tolist()
+    # Requested amounts per service line, kept before any per-service cap
+    maxb = dict(zip(service_lines, max_arr.tolist()))
+    
+    # Objective coefficients, unless the caller already computed them
+    if coef is None:
+        coef = _objective_coef(roi, prio, constraints)
     
     # Create decision variables (how much to allocate to each service line)
     allocations = LpVariable.dicts(
@@ -55,81 +209,124 @@ def optimize_budget_allocation(
     )
     
     # Binary variables: whether to fund each service line (0 or 1)
+    # Only needed for minimum viable budgets or a funded-project count;
+    # otherwise the problem stays a pure LP
+    needs_funded = bool((min_arr > 0).any()) or bool(constraints and 'min_funded_projects' in constraints)
     funded = LpVariable.dicts(
         "funded",
         service_lines,
         cat='Binary'
-    )
+    ) if needs_funded else None
     
     # Objective function: Maximize weighted ROI
     # ROI = (allocation * expected_roi * strategic_priority)
-    objective = lpSum([
-        allocations[sl] * 
-        float(resource_requests[resource_requests['service_line'] == sl]['expected_roi'].values[0]) *
-        float(resource_requests[resource_requests['service_line'] == sl]['strategic_priority'].values[0])
-        for sl in service_lines
-    ])
+    objective = lpSum(c * v for c, v in zip(coef.tolist(), allocations.values()))
     
     prob += objective, "Total_Weighted_ROI"
     
     # Constraint 1: Total allocation cannot exceed available budget
-    prob += lpSum([allocations[sl] for sl in service_lines]) <= total_budget, "Total_Budget_Constraint"
+    prob += lpSum(allocations.values()) <= total_budget, "Total_Budget_Constraint"
+    
+    # Optional Constraint 4: Maximum allocation per service line
+    # Folded into the per-line upper bound rather than added as extra rows
+    if constraints and 'max_per_service' in constraints:
+        max_arr = np.minimum(max_arr, constraints['max_per_service'])
     
     # Constraint 2: If funded, allocation must be at least minimum viable budget
-    for sl in service_lines:
-        min_budget = float(resource_requests[resource_requests['service_line'] == sl]['min_viable_budget'].values[0])
-        max_budget = float(resource_requests[resource_requests['service_line'] == sl]['budget_requested'].values[0])
-        
-        # If funded, allocation >= min_viable_budget
-        prob += allocations[sl] >= min_budget * funded[sl], f"Min_Budget_{sl}"
-        
-        # Allocation cannot exceed requested amount
-        prob += allocations[sl] <= max_budget * funded[sl], f"Max_Budget_{sl}"
+    # and cannot exceed the requested amount; added in one bulk extend.
+    # Rows are named L<i>/U<i> by position in service_lines to keep the LP
+    # file CBC parses small
+    bounds = enumerate(zip(service_lines, min_arr.tolist(), max_arr.tolist()))
+    if funded is not None:
+        prob.extend({
+            name: constraint
+            for i, (sl, min_budget, max_budget) in bounds
+            for name, constraint in (
+                (f"L{i}", allocations[sl] >= min_budget * funded[sl]),
+                (f"U{i}", allocations[sl] <= max_budget * funded[sl])
+            )
+        })
+    else:
+        prob.extend({
+            f"U{i}": allocations[sl] <= max_budget
+            for i, (sl, min_budget, max_budget) in bounds
+        })
     
     # Optional Constraint 3: Minimum number of funded projects
     if constraints and 'min_funded_projects' in constraints:
         min_projects = constraints['min_funded_projects']
-        prob += lpSum([funded[sl] for sl in service_lines]) >= min_projects, "Min_Funded_Projects"
-    
-    # Optional Constraint 4: Maximum allocation per service line
-    if constraints and 'max_per_service' in constraints:
-        max_per_service = constraints['max_per_service']
-        for sl in service_lines:
-            prob += allocations[sl] <= max_per_service, f"Max_Per_Service_{sl}"
+        prob += lpSum(funded.values()) >= min_projects, "Min_Funded_Projects"
+    
+    return {
+        'prob': prob,
+        'service_lines': service_lines,
+        'allocations': allocations,
+        'funded': funded,
+        'roi': dict(zip(service_lines, roi.tolist())),
+        'prio': dict(zip(service_lines, prio.tolist())),
+        'maxb': maxb
+    }
+
+def _relaxed_allocation(coef, roi, min_arr, max_arr, total_budget):
+    """
+    Solve the LP relaxation greedily and return it if it is MILP-feasible.
+    
+    Without the binaries the problem is a fractional knapsack: fill service
+    lines in order of weighted ROI up to their request, skipping lines whose
+    weighted ROI is not positive. If every non-zero allocation also clears
+    its minimum viable budget, that allocation is feasible for the MILP and
+    hence optimal; otherwise None is returned. Ties in weighted ROI go to
+    the line with the higher raw ROI, then to the earlier row.
+    """
+    order = np.lexsort((-roi, -coef))
+    caps = np.where(coef[order] > 0, max_arr[order], 0)
+    filled_before = np.cumsum(caps) - caps
     
-    # Optional Constraint 5: Strategic priority threshold
-    # High priority projects (priority >= 4) should be funded if possible
-    if constraints and 'prioritize_high_priority' in constraints:
-        if constraints['prioritize_high_priority']:
-            high_priority = resource_requests[resource_requests['strategic_priority'] >= 4]['service_line'].tolist()
-            for sl in high_priority:
-                # Encourage funding of high priority projects by setting minimum allocation
-                prob += allocations[sl] >= 0, f"High_Priority_{sl}"
+    allocation = np.empty_like(max_arr)
+    allocation[order] = np.clip(total_budget - filled_before, 0, caps)
     
-    # Solve the optimization problem
-    prob.solve(PULP_CBC_CMD(msg=0))
+    if np.all((allocation == 0) | (allocation >= min_arr)):
+        return allocation
+    return None
+
+def _extract_results(model, total_budget):
+    prob, service_lines = model['prob'], model['service_lines']
+    allocations, funded = model['allocations'], model['funded']
+    
+    # Read each solved variable value once
+    alloc_vals = {sl: allocations[sl].varValue or 0 for sl in service_lines}
+    if funded is None:
+        funded_vals = {sl: alloc_vals[sl] > 0 for sl in service_lines}
+    else:
+        funded_vals = {sl: funded[sl].varValue == 1 for sl in service_lines}
+    
+    return _assemble_results(LpStatus[prob.status], value(prob.objective), model, alloc_vals, funded_vals, total_budget)
+
+def _assemble_results(status, objective_value, lookups, alloc_vals, funded_vals, total_budget):
+    service_lines = lookups['service_lines']
+    roi, prio, maxb = lookups['roi'], lookups['prio'], lookups['maxb']
     
     # Extract results
     results = {
-        'status': LpStatus[prob.status],
-        'total_allocated': sum([allocations[sl].varValue for sl in service_lines if allocations[sl].varValue]),
+        'status': status,
+        'total_allocated': sum(alloc_vals.values()),
         'allocations': {},
         'funded_projects': [],
         'unfunded_projects': [],
-        'objective_value': value(prob.objective),
+        'objective_value': objective_value,
         'budget_utilization': 0
     }
     
     for sl in service_lines:
-        allocation = allocations[sl].varValue if allocations[sl].varValue else 0
-        is_funded = funded[sl].varValue == 1 if funded[sl].varValue else False
+        allocation = alloc_vals[sl]
+        is_funded = funded_vals[sl]
         
         results['allocations'][sl] = {
             'allocated': allocation,
             'funded': is_funded,
-            'requested': float(resource_requests[resource_requests['service_line'] == sl]['budget_requested'].values[0]),
-            'expected_roi': float(resource_requests[resource_requests['service_line'] == sl]['expected_roi'].values[0]),
-            'strategic_priority': float(resource_requests[resource_requests['service_line'] == sl]['strategic_priority'].values[0])
+            'requested': maxb[sl],
+            'expected_roi': roi[sl],
+            'strategic_priority': prio[sl]
         }
         
         if is_funded:
@@ -161,13 +358,30 @@ def optimize_with_scenarios(resource_requests, scenarios):
     Returns:
         dict: Results for each scenario
     """
-    results = {}
-    
-    for scenario_name, budget in scenarios.items():
-        results[scenario_name] = optimize_budget_allocation(
-            resource_requests,
-            budget
+    # One key per call: the frame is hashed and its arrays extracted once,
+    # and each scenario budget still goes through the memoized solve
+    requests_key = _RequestsKey(resource_requests)
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(len(scenarios), MAX_SOLVER_WORKERS))) as executor:
+        solved = executor.map(
+            lambda budget: _cached_result(requests_key, budget),
+            scenarios.values()
         )
+        results = dict(zip(scenarios.keys(), solved))
+    
+    return results
+
+def _solve_budget_run(inputs, budgets):
+    """Solve consecutive budgets on one problem, warm-starting each from the last."""
+    model = _build_problem(*inputs, budgets[0], None)
+    budget_constraint = model['prob'].constraints['Total_Budget_Constraint']
+    solver = _make_solver(model['funded'] is not None, warm_start=True)
+    
+    results = []
+    for budget in budgets:
+        budget_constraint.constant = -float(budget)
+        model['prob'].solve(solver)
+        results.append(_extract_results(model, budget))
     
     return results
 
@@ -184,28 +398,101 @@ def sensitivity_analysis(resource_requests, base_budget, sensitivity_range=0.2,
     Returns:
         DataFrame: Sensitivity analysis results
     """
-    
+    # Repeated calls with the same requests and sweep reuse the earlier table
+    table = _sensitivity_cached(
+        _RequestsKey(resource_requests),
+        float(base_budget),
+        float(sensitivity_range),
+        int(steps)
+    )
+    return table.copy()
+
+@lru_cache(maxsize=32)
+def _sensitivity_cached(requests_key, base_budget, sensitivity_range, steps):
     budgets = np.linspace(
         base_budget * (1 - sensitivity_range),
         base_budget * (1 + sensitivity_range),
         steps
     )
     
-    results = []
-    
-    for budget in budgets:
-        opt_result = optimize_budget_allocation(resource_requests, budget)
+    # One preallocated row per step, filled in as each step is resolved
+    columns = ['budget', 'budget_pct_change', 'total_allocated', 'projects_funded', 'expected_return', 'blended_roi']
+    table = np.empty((len(budgets), len(columns)))
+    table[:, 0] = budgets
+    table[:, 1] = ((budgets - base_budget) / base_budget) * 100
+    
+    # Frame-to-array extraction happens once for every step
+    inputs = requests_key.inputs
+    _, rois, prios, mins, requested = inputs
+    coef = _objective_coef(rois, prios, None)
+    
+    # Coinciding budgets (e.g. sensitivity_range=0) are resolved once and
+    # copied back to every step that uses them
+    unique_budgets, step_budget = np.unique(budgets, return_inverse=True)
+    solved_rows = np.empty((len(unique_budgets), len(columns) - 2))
+    
+    # Budgets where the LP relaxation is already MILP-feasible skip CBC
+    pending = []
+    for i, budget in enumerate(unique_budgets):
+        relaxed = _relaxed_allocation(coef, rois, mins, requested, budget)
+        if relaxed is None:
+            pending.append(i)
+            continue
         
-        results.append({
-            'budget': budget,
-            'budget_pct_change': ((budget - base_budget) / base_budget) * 100,
-            'total_allocated': opt_result['total_allocated'],
-            'projects_funded': len(opt_result['funded_projects']),
-            'expected_return': opt_result['total_expected_return'],
-            'blended_roi': opt_result['blended_roi']
-        })
+        total_allocated = relaxed.sum()
+        expected_return = (relaxed * rois).sum()
+        solved_rows[i] = (
+            total_allocated,
+            np.count_nonzero(relaxed),
+            expected_return,
+            expected_return / total_allocated if total_allocated > 0 else 0
+        )
+    
+    # The rest are split into contiguous runs solved in parallel; only the
+    # budget right-hand side changes along a run, so each one warm-starts
+    if pending:
+        runs = [run.tolist() for run in np.array_split(np.array(pending), min(len(pending), MAX_SOLVER_WORKERS))]
+        with ThreadPoolExecutor(max_workers=len(runs)) as executor:
+            solved = executor.map(lambda run: _solve_budget_run(inputs, unique_budgets[run]), runs)
+            for run, run_results in zip(runs, solved):
+                for i, opt_result in zip(run, run_results):
+                    solved_rows[i] = (
+                        opt_result['total_allocated'],
+                        len(opt_result['funded_projects']),
+                        opt_result['total_expected_return'],
+                        opt_result['blended_roi']
+                    )
+    
+    table[:, 2:] = solved_rows[step_budget]
+    
+    results = pd.DataFrame(table, columns=columns)
+    results['projects_funded'] = results['projects_funded'].astype(int)
     
-    return pd.DataFrame(results)
+    return results
+
+def _fixed_strategy(service_lines, alloc, rois, total_budget):
+    # Closed-form strategies: returns are one dot product, blended over the full budget
+    expected_return = float(alloc @ rois)
+    return {
+        'allocations': {
+            sl: {'allocated': a, 'expected_roi': r}
+            for sl, a, r in zip(service_lines, alloc.tolist(), rois.tolist())
+        },
+        'total_allocated': total_budget,
+        'total_expected_return': expected_return,
+        'blended_roi': expected_return / total_budget
+    }
+
+@njit(cache=True)
+def _priority_greedy(requested, mins, order, remaining):
+    # Fund lines in the given order while the remaining budget covers their minimum
+    allocs = np.zeros_like(requested)
+    for i in order:
+        if remaining >= mins[i]:
+            a = min(requested[i], remaining)
+            allocs[i] = a
+            remaining -= a
+    return allocs
 
 def compare_allocation_strategies(resource_requests, total_budget):
     """
@@ -230,76 +517,31 @@ def compare_allocation_strategies(resource_requests, total_budget):
     # Strategy 1: Optimized (ROI-weighted)
     strategies['Optimized'] = optimize_budget_allocation(resource_requests, total_budget)
     
-    # Strategy 2: Equal distribution
-    equal_amount = total_budget / len(resource_requests)
-    strategies['Equal'] = {
-        'allocations': {},
-        'total_allocated': total_budget,
-        'blended_roi': 0
-    }
-    
-    for _, row in resource_requests.iterrows():
-        sl = row['service_line']
-        allocation = min(equal_amount, row['budget_requested'])
-        strategies['Equal']['allocations'][sl] = {
-            'allocated': allocation,
-            'expected_roi': row['expected_roi']
-        }
+    service_lines, rois, _, mins, requested = _request_arrays(resource_requests)
     
-    equal_return = sum([v['allocated'] * v['expected_roi'] for v in strategies['Equal']['allocations'].values()])
-    strategies['Equal']['total_expected_return'] = equal_return
-    strategies['Equal']['blended_roi'] = equal_return / total_budget
+    # Strategy 2: Equal distribution
+    equal_alloc = np.minimum(total_budget / len(resource_requests), requested)
+    strategies['Equal'] = _fixed_strategy(service_lines, equal_alloc, rois, total_budget)
     
     # Strategy 3: Priority-based
-    priority_sorted = resource_requests.sort_values('strategic_priority', ascending=False).copy()
+    # Positions in priority order, independent of the frame's index labels
+    positions = resource_requests['strategic_priority'].reset_index(drop=True).sort_values(ascending=False).index.to_numpy()
+    priority_alloc = _priority_greedy(requested, mins, positions, float(total_budget))
+    
+    priority_total = float(priority_alloc.sum())
+    priority_return = float((priority_alloc * rois).sum())
     strategies['Priority'] = {
-        'allocations': {},
-        'total_allocated': 0,
-        'blended_roi': 0
+        'allocations': {
+            service_lines[i]: {'allocated': float(priority_alloc[i]), 'expected_roi': float(rois[i])}
+            for i in positions
+        },
+        'total_allocated': priority_total,
+        'total_expected_return': priority_return,
+        'blended_roi': priority_return / priority_total if priority_total > 0 else 0
     }
     
-    remaining = total_budget
-    for _, row in priority_sorted.iterrows():
-        sl = row['service_line']
-        if remaining >= row['min_viable_budget']:
-            allocation = min(row['budget_requested'], remaining)
-            strategies['Priority']['allocations'][sl] = {
-                'allocated': allocation,
-                'expected_roi': row['expected_roi']
-            }
-            strategies['Priority']['total_allocated'] += allocation
-            remaining -= allocation
-        else:
-            strategies['Priority']['allocations'][sl] = {
-                'allocated': 0,
-                'expected_roi': row['expected_roi']
-            }
-    
-    priority_return = sum([v['allocated'] * v['expected_roi'] for v in strategies['Priority']['allocations'].values()])
-    strategies['Priority']['total_expected_return'] = priority_return
-    strategies['Priority']['blended_roi'] = priority_return / strategies['Priority']['total_allocated'] if strategies['Priority']['total_allocated'] > 0 else 0
-    
     # Strategy 4: Proportional to request
-    total_requested = resource_requests['budget_requested'].sum()
-    strategies['Proportional'] = {
-        'allocations': {},
-        'total_allocated': total_budget,
-        'blended_roi': 0
-    }
-    
-    for _, row in resource_requests.iterrows():
-        sl = row['service_line']
-        proportion = row['budget_requested'] / total_requested
-        allocation = total_budget * proportion
-        allocation = min(allocation, row['budget_requested'])
-        
-        strategies['Proportional']['allocations'][sl] = {
-            'allocated': allocation,
-            'expected_roi': row['expected_roi']
-        }
-    
-    prop_return = sum([v['allocated'] * v['expected_roi'] for v in strategies['Proportional']['allocations'].values()])
-    strategies['Proportional']['total_expected_return'] = prop_return
-    strategies['Proportional']['blended_roi'] = prop_return / total_budget
+    prop_alloc = np.minimum(total_budget * requested / requested.sum(), requested)
+    strategies['Proportional'] = _fixed_strategy(service_lines, prop_alloc, rois, total_budget)
     
     return strategies
@@ -6,26 +6,35 @@ Author: Ye(Alexia) Quan
 """
 
 import sys
+from functools import lru_cache
 import pandas as pd
 import numpy as np
 
+@lru_cache(maxsize=None)
+def _load(path):
+    """Read a table once per run; later tests reuse the parsed frame"""
+    df = pd.read_parquet(path)
+    # Service line and constraint type become categoricals so equality
+    # filters compare integer codes
+    return df.astype({c: 'category' for c in ('service_line', 'constraint_type') if c in df})
+
 def test_data_files():
     """Test that all data files exist and load correctly"""
     print("Test 1: Data Files")
     print("-" * 50)
     
     files_to_check = [
-        'data/resource_requests.csv',
-        'data/historical_roi.csv',
-        'data/service_metrics.csv',
-        'data/process_quality.csv',
-        'data/constraints.csv'
+        'data/tables/name=resource_requests/part.parquet',
+        'data/tables/name=historical_roi/part.parquet',
+        'data/tables/name=service_metrics/part.parquet',
+        'data/tables/name=process_quality/part.parquet',
+        'data/tables/name=constraints/part.parquet'
     ]
     
     all_good = True
     for file in files_to_check:
         try:
-            df = pd.read_csv(file)
+            df = _load(file)
             print(f"  ✓ {file}: {len(df)} records")
         except Exception as e:
             print(f"  ✗ {file}: ERROR - {e}")
@@ -42,8 +51,8 @@ def test_optimization_module():
         from src.optimization import optimize_budget_allocation
         
         # Load sample data
-        resource_requests = pd.read_csv('data/resource_requests.csv')
-        constraints_df = pd.read_csv('data/constraints.csv')
+        resource_requests = _load('data/tables/name=resource_requests/part.parquet')
+        constraints_df = _load('data/tables/name=constraints/part.parquet')
         total_budget = constraints_df[constraints_df['constraint_type'] == 'total_budget']['value'].values[0]
         
         # Run optimization
@@ -64,6 +73,87 @@ def test_optimization_module():
         print(f"  ✗ Optimization module ERROR: {e}")
         return False
 
+def test_optimizer_shortcuts():
+    """Test that the no-solve shortcuts match the known optimum"""
+    print("\nTest 5: Optimizer Shortcuts")
+    print("-" * 50)
+    
+    try:
+        from src.optimization import optimize_budget_allocation, sensitivity_analysis
+        
+        # Line c loses money, so the optimum never funds it
+        requests = pd.DataFrame({
+            'service_line': ['a', 'b', 'c'],
+            'budget_requested': [1e6, 1e6, 1e6],
+            'min_viable_budget': [5e5, 5e5, 5e5],
+            'expected_roi': [2.0, 1.5, -0.5],
+            'strategic_priority': [3, 3, 3]
+        })
+        all_good = True
+        
+        # Budget covers every request: fund the profitable lines only
+        result = optimize_budget_allocation(requests, 3e6)
+        if result['funded_projects'] == ['a', 'b'] and abs(result['objective_value'] - 10.5e6) < 1:
+            print(f"  ✓ Full budget funds profitable lines only")
+        else:
+            print(f"  ✗ Full budget funded {result['funded_projects']} (objective {result['objective_value']:,.0f})")
+            all_good = False
+        
+        # Budget below every minimum: fund nothing
+        result = optimize_budget_allocation(requests, 1e5)
+        if not result['funded_projects'] and result['total_allocated'] == 0:
+            print(f"  ✓ Budget below minimums funds nothing")
+        else:
+            print(f"  ✗ Budget below minimums funded {result['funded_projects']}")
+            all_good = False
+        
+        # A line whose minimum exceeds its request can never be funded
+        unfundable = pd.DataFrame({
+            'service_line': ['a', 'b'],
+            'budget_requested': [1e6, 1e6],
+            'min_viable_budget': [5e5, 1.5e6],
+            'expected_roi': [2.0, 3.0],
+            'strategic_priority': [3, 3]
+        })
+        result = optimize_budget_allocation(unfundable, 5e6)
+        if result['funded_projects'] == ['a'] and abs(result['objective_value'] - 6e6) < 1:
+            print(f"  ✓ Full budget skips lines with minimum above request")
+        else:
+            print(f"  ✗ Full budget funded {result['funded_projects']} (objective {result['objective_value']:,.0f})")
+            all_good = False
+        
+        # Relaxed sensitivity steps must not spend on the loss-making line
+        sens = sensitivity_analysis(requests, 2.6e6, steps=5)
+        if np.allclose(sens['total_allocated'], 2e6) and np.allclose(sens['expected_return'], 3.5e6):
+            print(f"  ✓ Sensitivity steps match the optimum")
+        else:
+            print(f"  ✗ Sensitivity allocated {sens['total_allocated'].tolist()}")
+            all_good = False
+        
+        # Lines a and b tie on weighted ROI: every step must match the optimizer
+        tied = pd.DataFrame({
+            'service_line': ['a', 'b', 'c'],
+            'budget_requested': [1e6, 1e6, 1e6],
+            'min_viable_budget': [0, 0, 0],
+            'expected_roi': [2.0, 2.5, 1.0],
+            'strategic_priority': [5, 4, 3]
+        })
+        sens = sensitivity_analysis(tied, 1.5e6, sensitivity_range=0.5, steps=5)
+        mismatched = [
+            row.budget for row in sens.itertuples()
+            if abs(optimize_budget_allocation(tied, row.budget)['total_expected_return'] - row.expected_return) > 1
+        ]
+        if not mismatched:
+            print(f"  ✓ Sensitivity steps match the optimizer on tied lines")
+        else:
+            print(f"  ✗ Sensitivity differs from the optimizer at budgets {mismatched}")
+            all_good = False
+        
+        return all_good
+    except Exception as e:
+        print(f"  ✗ Optimizer shortcut ERROR: {e}")
+        return False
+
 def test_dependencies():
     """Test that required packages are installed"""
     print("\nTest 3: Dependencies")
@@ -74,7 +164,8 @@ def test_dependencies():
         'pandas',
         'numpy',
         'plotly',
-        'pulp'
+        'pulp',
+        'pyarrow'
     ]
     
     all_good = True
@@ -95,8 +186,8 @@ def test_data_quality():
     
     try:
         # Load data
-        resource_requests = pd.read_csv('data/resource_requests.csv')
-        constraints_df = pd.read_csv('data/constraints.csv')
+        resource_requests = _load('data/tables/name=resource_requests/part.parquet')
+        constraints_df = _load('data/tables/name=constraints/part.parquet')
         
         # Check for required columns
         required_cols = ['service_line', 'budget_requested', 'min_viable_budget', 'expected_roi', 'strategic_priority']
@@ -138,7 +229,8 @@ def main():
         ("Data Files", test_data_files),
         ("Dependencies", test_dependencies),
         ("Data Quality", test_data_quality),
-        ("Optimization Module", test_optimization_module)
+        ("Optimization Module", test_optimization_module),
+        ("Optimizer Shortcuts", test_optimizer_shortcuts)
     ]
     
     results = []